@@ -1,4 +1,5 @@
 import struct
+from profiler import span
 
 
 def clear(ep_in, ep_out, dev, tot):
@@ -21,37 +22,43 @@ def clear(ep_in, ep_out, dev, tot):
     while remaining_blocks > 0:
         # Determine how many blocks to write
         data_to_be_written = min(remaining_blocks, max_write_cap)
-        print(f"WRITE ({count}/{(data_blocks // max_write_cap) + 1}), LBA: {lba}")
+        with span("logging"):
+            print(f"WRITE ({count}/{(data_blocks // max_write_cap) + 1}), LBA: {lba}")
 
-        # Construct WRITE(10) command
-        write_cmd = bytes([
-            0x2A,  # WRITE(10) operation code
-            0x00,  # Flags
-            (lba >> 24) & 0xFF, (lba >> 16) & 0xFF, (lba >> 8) & 0xFF, lba & 0xFF,  # LBA
-            0x00,  # Reserved
-            (data_to_be_written >> 8) & 0xFF, data_to_be_written & 0xFF,  # Transfer length
-            0x00   # Control
-        ]) + bytes(6)  # Pad to 16 bytes for CBW
+        with span("CBW build"):
+            # Construct WRITE(10) command
+            write_cmd = bytes([
+                0x2A,  # WRITE(10) operation code
+                0x00,  # Flags
+                (lba >> 24) & 0xFF, (lba >> 16) & 0xFF, (lba >> 8) & 0xFF, lba & 0xFF,  # LBA
+                0x00,  # Reserved
+                (data_to_be_written >> 8) & 0xFF, data_to_be_written & 0xFF,  # Transfer length
+                0x00   # Control
+            ]) + bytes(6)  # Pad to 16 bytes for CBW
 
-        # Construct CBW
-        cbw = struct.pack("<I", CBW_SIGNATURE)  # CBW Signature
-        cbw += struct.pack("<I", CBW_TAG)       # CBW Tag
-        cbw += struct.pack("<I", block_size * data_to_be_written)  # Data transfer length
-        cbw += struct.pack("B", CBW_FLAGS)      # Flags: OUT (for write)
-        cbw += struct.pack("B", CBW_LUN)        # LUN
-        cbw += struct.pack("B", CBW_CB_LEN)     # CDB Length
-        cbw += write_cmd[:16]                   # CDB (padded to 16 bytes)
-        assert len(cbw) == 31, "CBW must be 31 bytes"
+            # Construct CBW
+            cbw = struct.pack("<I", CBW_SIGNATURE)  # CBW Signature
+            cbw += struct.pack("<I", CBW_TAG)       # CBW Tag
+            cbw += struct.pack("<I", block_size * data_to_be_written)  # Data transfer length
+            cbw += struct.pack("B", CBW_FLAGS)      # Flags: OUT (for write)
+            cbw += struct.pack("B", CBW_LUN)        # LUN
+            cbw += struct.pack("B", CBW_CB_LEN)     # CDB Length
+            cbw += write_cmd[:16]                   # CDB (padded to 16 bytes)
+            assert len(cbw) == 31, "CBW must be 31 bytes"
 
         # Send CBW
-        dev.write(ep_out.bEndpointAddress, cbw, timeout=1000)
+        with span("bulk OUT"):
+            dev.write(ep_out.bEndpointAddress, cbw, timeout=1000)
 
         # Write zeroed data
-        dev.write(ep_out.bEndpointAddress, overwrite_data[:block_size * data_to_be_written], timeout=20000)
+        with span("bulk OUT data"):
+            dev.write(ep_out.bEndpointAddress, overwrite_data[:block_size * data_to_be_written], timeout=20000)
 
         # Read CSW (Check Status Wrapper)
-        csw = dev.read(ep_in.bEndpointAddress, 13, timeout=1000)
-        print("CSW Response:", csw)
+        with span("CSW"):
+            csw = dev.read(ep_in.bEndpointAddress, 13, timeout=1000)
+        with span("logging"):
+            print("CSW Response:", csw)
 
         # Update LBA and remaining blocks
         lba += data_to_be_written
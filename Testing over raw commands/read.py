@@ -1,6 +1,7 @@
 import struct
 import time
 import pandas as pd 
+from profiler import span
 
 
 def read(ep_in,ep_out,dev,tot):
@@ -22,43 +23,49 @@ def read(ep_in,ep_out,dev,tot):
     latency = 0
     while remaining_blocks > 0:
         data_to_be_read = min(remaining_blocks, max_read_cap)
-        print(f"READ ({count}/{(data_blocks // max_read_cap)+1}) , LBA : {lba}")
+        with span("logging"):
+            print(f"READ ({count}/{(data_blocks // max_read_cap)+1}) , LBA : {lba}")
 
-        # Construct READ(10) command
-        read_cmd = bytes([
-            0x28,  # READ(10) operation code
-            0x00,  # Flags
-            (lba >> 24) & 0xFF, (lba >> 16) & 0xFF, (lba >> 8) & 0xFF, lba & 0xFF,  # LBA
-            0x00,  # Reserved
-            (data_to_be_read >> 8) & 0xFF, data_to_be_read & 0xFF,  # Transfer length
-            0x00   # Control
-        ]) + bytes(6)  # Pad to 16 bytes for CBW
+        with span("CBW build"):
+            # Construct READ(10) command
+            read_cmd = bytes([
+                0x28,  # READ(10) operation code
+                0x00,  # Flags
+                (lba >> 24) & 0xFF, (lba >> 16) & 0xFF, (lba >> 8) & 0xFF, lba & 0xFF,  # LBA
+                0x00,  # Reserved
+                (data_to_be_read >> 8) & 0xFF, data_to_be_read & 0xFF,  # Transfer length
+                0x00   # Control
+            ]) + bytes(6)  # Pad to 16 bytes for CBW
 
-        # Construct CBW
-        cbw = struct.pack("<I", CBW_SIGNATURE)  # CBW Signature
-        cbw += struct.pack("<I", CBW_TAG)       # CBW Tag
-        cbw += struct.pack("<I", block_size * data_to_be_read)  # Data transfer length
-        cbw += struct.pack("B", CBW_FLAGS)      # Flags: IN
-        cbw += struct.pack("B", CBW_LUN)        # LUN
-        cbw += struct.pack("B", CBW_CB_LEN)     # CDB Length
-        cbw += read_cmd[:16]                    # CDB (padded)
+            # Construct CBW
+            cbw = struct.pack("<I", CBW_SIGNATURE)  # CBW Signature
+            cbw += struct.pack("<I", CBW_TAG)       # CBW Tag
+            cbw += struct.pack("<I", block_size * data_to_be_read)  # Data transfer length
+            cbw += struct.pack("B", CBW_FLAGS)      # Flags: IN
+            cbw += struct.pack("B", CBW_LUN)        # LUN
+            cbw += struct.pack("B", CBW_CB_LEN)     # CDB Length
+            cbw += read_cmd[:16]                    # CDB (padded)
 
-        assert len(cbw) == 31, "CBW must be 31 bytes"
+            assert len(cbw) == 31, "CBW must be 31 bytes"
 
         # Send CBW
-        dev.write(ep_out.bEndpointAddress, cbw, timeout=1000)
+        with span("bulk OUT"):
+            dev.write(ep_out.bEndpointAddress, cbw, timeout=1000)
 
         # Read data
-        read_start_time = time.time()
-        data = dev.read(ep_in.bEndpointAddress, block_size * data_to_be_read, timeout=20000)
-        read_end_time = time.time()
+        with span("bulk IN data"):
+            read_start_time = time.time()
+            data = dev.read(ep_in.bEndpointAddress, block_size * data_to_be_read, timeout=20000)
+            read_end_time = time.time()
 
         # Calculate and store latency
         latency += read_end_time - read_start_time
 
         # Read CSW
-        csw = dev.read(ep_in.bEndpointAddress, 13, timeout=1000)
-        print("CSW Response:", csw)
+        with span("CSW"):
+            csw = dev.read(ep_in.bEndpointAddress, 13, timeout=1000)
+        with span("logging"):
+            print("CSW Response:", csw)
         # Update remaining blocks and LBA
         remaining_blocks -= data_to_be_read
         lba += data_to_be_read
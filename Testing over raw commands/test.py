@@ -2,11 +2,14 @@ import usb.core
 import usb.util
 import pandas as pd
 import time
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # repo root, where profiler.py lives
 from write import write 
 from clear import clear
 from read import read
 from metadata import Inquiry1,Inquiry2,readcap
-import os
+import profiler
 import pwd
 
 # Find the USB device (adjust VID/PID if needed)
@@ -72,14 +75,15 @@ try:
     w_data = write(ep_in, ep_out, dev, tot)
     r_data = read(ep_in, ep_out, dev, tot)
     report = pd.concat([reads , w_data, r_data], axis=1)
-    with pd.ExcelWriter('test_report.xlsx',engine = "openpyxl") as writer:
-        metadata.to_excel(writer, sheet_name='metadata', index=False)
-        report.to_excel(writer, sheet_name='Testing', index=False)
-        current_user = os.getlogin()
-        user_info = pwd.getpwnam(current_user)
-        uid, gid = user_info.pw_uid, user_info.pw_gid
-        os.chown("test_report.xlsx", uid, gid)
-        print("Data written to test_report.xlsx")
+    with profiler.span("report I/O"):
+        with pd.ExcelWriter('test_report.xlsx',engine = "openpyxl") as writer:
+            metadata.to_excel(writer, sheet_name='metadata', index=False)
+            report.to_excel(writer, sheet_name='Testing', index=False)
+            current_user = os.getlogin()
+            user_info = pwd.getpwnam(current_user)
+            uid, gid = user_info.pw_uid, user_info.pw_gid
+            os.chown("test_report.xlsx", uid, gid)
+            print("Data written to test_report.xlsx")
     clear(ep_in, ep_out, dev, tot)
 
  
@@ -101,4 +105,5 @@ finally:
             dev.attach_kernel_driver(intf_number)
         print("Released interface and cleanup done.")
     except Exception as cleanup_error:
-        print("Cleanup error:", cleanup_error)
\ No newline at end of file
+        print("Cleanup error:", cleanup_error)
+    profiler.report("profile_trace.json") # per-phase host CPU vs device time, only when STORAGE_PROFILE=1
\ No newline at end of file
@@ -2,6 +2,7 @@ import pandas as pd
 import struct
 import time
 import os
+from profiler import span
 
 def write(ep_in, ep_out, dev, tot):
     CBW_SIGNATURE = 0x43425355
@@ -22,41 +23,47 @@ def write(ep_in, ep_out, dev, tot):
     starttime = time.time()
     while remaining_blocks > 0:
         data_to_be_written = min(remaining_blocks, max_write_cap)
-        print(f"write ({count}/{(tot_data_blocks // max_write_cap)+1}) , LBA : {lba}")
+        with span("logging"):
+            print(f"write ({count}/{(tot_data_blocks // max_write_cap)+1}) , LBA : {lba}")
 
-        # Construct write(10) command
-        write_cmd = bytes([
-            0x2A,  # WRITE(10) operation code
-            0x00,  # Flags
-            (lba >> 24) & 0xFF, (lba >> 16) & 0xFF, (lba >> 8) & 0xFF, lba & 0xFF,  # LBA
-            0x00,  # Reserved
-            (data_to_be_written >> 8) & 0xFF, data_to_be_written & 0xFF,  # Transfer length
-            0x00   # Control
-        ]) + bytes(6)  # Pad to 16 bytes for CBW
+        with span("CBW build"):
+            # Construct write(10) command
+            write_cmd = bytes([
+                0x2A,  # WRITE(10) operation code
+                0x00,  # Flags
+                (lba >> 24) & 0xFF, (lba >> 16) & 0xFF, (lba >> 8) & 0xFF, lba & 0xFF,  # LBA
+                0x00,  # Reserved
+                (data_to_be_written >> 8) & 0xFF, data_to_be_written & 0xFF,  # Transfer length
+                0x00   # Control
+            ]) + bytes(6)  # Pad to 16 bytes for CBW
 
-        # Construct CBW
-        cbw = struct.pack("<I", CBW_SIGNATURE)  # CBW Signature
-        cbw += struct.pack("<I", CBW_TAG)       # CBW Tag
-        cbw += struct.pack("<I", block_size * data_to_be_written)  # Data transfer length
-        cbw += struct.pack("B", CBW_FLAGS)      # Flags: IN
-        cbw += struct.pack("B", CBW_LUN)        # LUN
-        cbw += struct.pack("B", CBW_CB_LEN)     # CDB Length
-        cbw += write_cmd[:16]                    # CDB (padded)
-        assert len(cbw) == 31, "CBW must be 31 bytes"
+            # Construct CBW
+            cbw = struct.pack("<I", CBW_SIGNATURE)  # CBW Signature
+            cbw += struct.pack("<I", CBW_TAG)       # CBW Tag
+            cbw += struct.pack("<I", block_size * data_to_be_written)  # Data transfer length
+            cbw += struct.pack("B", CBW_FLAGS)      # Flags: IN
+            cbw += struct.pack("B", CBW_LUN)        # LUN
+            cbw += struct.pack("B", CBW_CB_LEN)     # CDB Length
+            cbw += write_cmd[:16]                    # CDB (padded)
+            assert len(cbw) == 31, "CBW must be 31 bytes"
         
         # Send CBW
-        dev.write(ep_out.bEndpointAddress, cbw, timeout=1000)
+        with span("bulk OUT"):
+            dev.write(ep_out.bEndpointAddress, cbw, timeout=1000)
         # write data
-        write_start_time = time.time()
-        data = dev.write(ep_out.bEndpointAddress, write_data[:block_size * data_to_be_written], timeout=20000)
-        write_end_time = time.time()
+        with span("bulk OUT data"):
+            write_start_time = time.time()
+            data = dev.write(ep_out.bEndpointAddress, write_data[:block_size * data_to_be_written], timeout=20000)
+            write_end_time = time.time()
 
         # Calculate and store latency
         latency += write_end_time - write_start_time
 
         # write CSW
-        csw = dev.read(ep_in.bEndpointAddress, 13, timeout=1000)
-        print("CSW Response:", csw)
+        with span("CSW"):
+            csw = dev.read(ep_in.bEndpointAddress, 13, timeout=1000)
+        with span("logging"):
+            print("CSW Response:", csw)
 
         # Update remaining blocks and LBA
         remaining_blocks -= data_to_be_written
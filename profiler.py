@@ -0,0 +1,133 @@
+import os
+import json
+import collections
+import time #perf_counter_ns gives wall time, thread_time_ns gives the CPU time spent by this thread only
+import threading
+import pandas as pd
+
+# Profiling is opt-in: set STORAGE_PROFILE=1 in the environment (or call enable()) to record spans.
+# When disabled, span() hands back one shared do-nothing object so the cost is a single function call.
+_enabled = os.environ.get("STORAGE_PROFILE", "").strip().lower() in {"1", "true", "yes", "on"}
+TRACE_EVENTS_MAX = 100000  # only the newest spans are kept for the trace file, so long runs stay bounded
+_totals = {}  # phase name -> [calls, wall_ns, cpu_ns], running totals used by summary()
+_trace = collections.deque(maxlen=TRACE_EVENTS_MAX)  # (name, start_ns, wall_ns, cpu_ns, thread id) of recent spans
+_lock = threading.Lock()
+_origin = time.perf_counter_ns()  # trace timestamps are relative to module import
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start", "cpu")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.cpu = time.thread_time_ns()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter_ns() - self.start
+        cpu = time.thread_time_ns() - self.cpu
+        with _lock:
+            totals = _totals.get(self.name)
+            if totals is None:
+                totals = _totals[self.name] = [0, 0, 0]
+            totals[0] += 1
+            totals[1] += wall
+            totals[2] += cpu
+            _trace.append((self.name, self.start, wall, cpu, threading.get_ident()))
+        return False
+
+
+def span(name):
+    """Time a named phase, e.g. `with span("bulk IN data"): ...`"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _totals.clear()
+        _trace.clear()
+
+
+def summary():
+    """Per-phase breakdown of wall time vs host CPU time, slowest phase first."""
+    with _lock:
+        totals = [(name, *values) for name, values in _totals.items()]
+    columns = ["Phase", "Calls", "Wall (ms)", "CPU (ms)", "Wait (ms)", "Mean wall (ms)", "CPU share (%)"]
+    if not totals:
+        return pd.DataFrame(columns=columns)
+
+    grouped = pd.DataFrame(totals, columns=["Phase", "Calls", "Wall", "CPU"]).set_index("Phase")
+    report = pd.DataFrame({
+        "Phase": grouped.index,
+        "Calls": grouped["Calls"].values,
+        "Wall (ms)": grouped["Wall"].values / 1e6,
+        "CPU (ms)": grouped["CPU"].values / 1e6,
+        "Wait (ms)": (grouped["Wall"].values - grouped["CPU"].values).clip(min=0) / 1e6,  # time spent blocked on the device/OS
+        "Mean wall (ms)": grouped["Wall"].values / grouped["Calls"].values / 1e6,
+        "CPU share (%)": 100 * grouped["CPU"].values / grouped["Wall"].values.clip(min=1),
+    })
+    return report.sort_values("Wall (ms)", ascending=False).round(3).reset_index(drop=True)
+
+
+def dump_chrome_trace(path):
+    """Write the most recent spans in Chrome trace format (open with chrome://tracing or Perfetto)."""
+    with _lock:
+        records = list(_trace)
+    pid = os.getpid()
+    events = [
+        {
+            "name": name,
+            "cat": "storage",
+            "ph": "X",  # complete event: start + duration
+            "ts": (start - _origin) / 1000,  # microseconds
+            "dur": wall / 1000,
+            "pid": pid,
+            "tid": tid,
+            "args": {"cpu_us": cpu / 1000},
+        }
+        for name, start, wall, cpu, tid in records
+    ]
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def report(trace_path=None):
+    """Print the per-phase breakdown and optionally dump a trace file; does nothing when profiling is off."""
+    if not _enabled:
+        return
+    print(summary().to_string(index=False))
+    if trace_path:
+        dump_chrome_trace(trace_path)
+        print(f"Profile trace written to {trace_path}")
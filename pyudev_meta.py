@@ -9,9 +9,17 @@ import logging #used to create log files for our reference
 import psutil #allows us to monitor system performance and resource usage
 from datetime import datetime
 import uuid #  helps us fetch the UUID of a specific device
-
-# Initialize an empty DataFrame with relevant columns
-df = pd.DataFrame(columns=["Device", "Model", "UUID","Serial Number", "Device Type", "Partitions", "Sector Size", "Total Sectors", "Size (Gigabytes)","Free space(GB)","Filesystem type","Temperature(Celsius)"])
+import time
+import profiler # opt-in phase timing (wall vs CPU time), enabled with STORAGE_PROFILE=1
+from telemetry import TelemetryStore # bounded per device history with rolling trends
+
+# Columns of the report, one row per device holding its latest snapshot and trends
+columns = ["Device", "Model", "UUID", "Time", "Serial Number", "Device Type", "Partitions", "Sector Size", "Total Sectors", "Size (Gigabytes)","Free space(GB)","Filesystem type","Temperature(Celsius)",
+           "Samples", "Fill rate(GB/h)", "Time to full(h)", "Temp min", "Temp max", "Temp slope(C/h)", "Alerts"]
+latest = {} # device -> latest row, replaced every sweep so the report does not grow
+store = TelemetryStore(capacity=1024) # keeps the last 1024 samples per device for the trend statistics
+SWEEP_COUNT = int(os.environ.get("SWEEP_COUNT", "3")) # number of sweeps over all devices, 0 keeps sweeping until stopped
+SWEEP_INTERVAL = float(os.environ.get("SWEEP_INTERVAL", "60")) # seconds between the start of two sweeps
 
 def get_sectors(device):
     try:
@@ -25,33 +33,35 @@ def get_sectors(device):
 
 
 def get_partitions(disk):
-    context = pyudev.Context() #to make use of pyudev, the context must be created which lets us query and interact to the linux device/disk manager
-    partitions = [
-        dev.device_node for dev in context.list_devices(subsystem="block")
-        if dev.get("DEVTYPE") == "partition" and dev.find_parent("block").device_node == disk  #searches for all the sub blocks in a device having a common basename
-    ] 
+    with profiler.span("udev walk"):
+        context = pyudev.Context() #to make use of pyudev, the context must be created which lets us query and interact to the linux device/disk manager
+        partitions = [
+            dev.device_node for dev in context.list_devices(subsystem="block")
+            if dev.get("DEVTYPE") == "partition" and dev.find_parent("block").device_node == disk  #searches for all the sub blocks in a device having a common basename
+        ] 
     return partitions
 
 
 def get_device_details(device):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         """Retrieve detailed information about a storage device."""
-        global df  # Ensure we modify the global DataFrame
         sysfs_path = f"/sys/class/block/{os.path.basename(device)}/size" #defining the the path if the system being assessed
+        latest.pop(device, None) # a failed read must not leave last sweep's row in the report as if it were current
 
         try:
-            context = pyudev.Context()
-            device_path = os.path.realpath(device) #obtaining the path of the the device
-            dev = None
-            for dev_obj in context.list_devices(subsystem="block"): #checks for all the systems in the storage 
-                if dev_obj.device_node == device_path: #looks for th specific device for which we require the status of.
-                    dev = dev_obj
-                    logger.info(f'{device} found: collecting info------------------------------------------------------------')
-                    break
-
+            with profiler.span("udev walk"):
+                context = pyudev.Context()
+                device_path = os.path.realpath(device) #obtaining the path of the the device
+                dev = None
+                for dev_obj in context.list_devices(subsystem="block"): #checks for all the systems in the storage 
+                    if dev_obj.device_node == device_path: #looks for th specific device for which we require the status of.
+                        dev = dev_obj
+                        break
+            if dev is not None:
+                logger.info(f'{device} found: collecting info------------------------------------------------------------')
             else:
-                    print(f"\nDevice {device} not found.")
-                    return
+                print(f"\nDevice {device} not found.")
+                return
 
             # Retrieve basic device details using dev.get() function part of the pyudev module
             model = dev.get("ID_MODEL", "Unknown")
@@ -102,27 +112,42 @@ def get_device_details(device):
                 "Filesystem type": filesys,
                 "Temperature(Celsius)" : tempr
             }
-            df = pd.concat([df, pd.DataFrame([data])], ignore_index=True) #entering the values of "data" into a dataframe
-            df.to_excel("storage details.xlsx", index=False) # converting th edataframe into an excel 
-            logger.info(f"data for {device} entered into excel sheet.")
-            print("saved as excel")
+            stats, alerts = store.record(device, free_space, tempr) #updating the rolling statistics with this sweep
+            for key in ("Samples", "Fill rate(GB/h)", "Time to full(h)", "Temp min", "Temp max", "Temp slope(C/h)"):
+                data[key] = stats[key]
+            data["Alerts"] = "; ".join(alerts) if alerts else "None"
+            for alert in alerts:
+                logger.warning(f"{device}: {alert}")
+
+            latest[device] = data
+            logger.info(f"data for {device} collected.")
 
 
         except Exception as e:
             logger.error(f"error fetching details for {device}:{e}")
 
 
+def write_report():
+    df = pd.DataFrame(list(latest.values()), columns=columns) #entering the latest values of every device into a dataframe
+    with profiler.span("report I/O"):
+        df.to_excel("storage details.xlsx", index=False) # converting the dataframe into an excel, once per sweep
+    logger.info(f"data for {len(df)} devices entered into excel sheet.")
+    print("saved as excel")
+
+
 def get_all_devices():
-    context = pyudev.Context()
-    devices = [
-        dev.device_node for dev in context.list_devices(subsystem="block") #lists all the devices in the storage
-        if dev.device_node.startswith("/dev/sd") or dev.device_node.startswith("/dev/nvme") #takes all the devices having sd or nvme in the basename
-    ]
+    with profiler.span("udev walk"):
+        context = pyudev.Context()
+        devices = [
+            dev.device_node for dev in context.list_devices(subsystem="block") #lists all the devices in the storage
+            if dev.device_node.startswith("/dev/sd") or dev.device_node.startswith("/dev/nvme") #takes all the devices having sd or nvme in the basename
+        ]
     return devices
 
 def get_temp(device):
     try:
-        output = subprocess.check_output(["smartctl", "-A", device], universal_newlines=True)
+        with profiler.span("smartctl"):
+            output = subprocess.check_output(["smartctl", "-A", device], universal_newlines=True)
         for line in output.split("\n"):
             if "Temperature" in line or "Temperature Sensor 1" in line:
                 t = re.search(r'\d+', line) # Extract last column (temperature)
@@ -144,15 +169,33 @@ file_handler = logging.FileHandler('my_application.log')
 formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')#setting the format of the log file 
 file_handler.setFormatter(formatter)
 logger.addHandler(file_handler)
-for i in range(0,3):
-    for device in devices:
-        get_device_details(device)
-        # Get current process info
-        pid = os.getpid()  # Get Process ID
-        process = psutil.Process(pid)
-
-        # Get CPU and memory usage
-        cpu_usage = process.cpu_percent(interval=1)
+process = psutil.Process(os.getpid())
+process.cpu_percent(interval=None) # first call only starts the measurement, later calls report usage since the previous one
+sweep = 0
+try:
+    while SWEEP_COUNT == 0 or sweep < SWEEP_COUNT:
+        sweep_start = time.monotonic()
+        if sweep > 0:
+            devices = get_all_devices() # picks up devices plugged in or removed since the last sweep
+            for device in set(latest) | set(store.devices):
+                if device not in devices:
+                    latest.pop(device, None)
+                    store.forget(device)
+                    logger.info(f"{device} removed: dropped from report")
+        for device in devices:
+            get_device_details(device)
+        write_report()
+
+        # Get CPU and memory usage over this sweep
+        cpu_usage = process.cpu_percent(interval=None)
         memory_usage = process.memory_info().rss / (1024 * 1024)  # Convert to MB
-        logger.info(f"system stats: cpu usage: {cpu_usage},memory usage: {memory_usage}")
-logger.info("END")
\ No newline at end of file
+        with profiler.span("logging"):
+            logger.info(f"system stats: cpu usage: {cpu_usage},memory usage: {memory_usage}")
+
+        sweep += 1
+        if SWEEP_COUNT == 0 or sweep < SWEEP_COUNT:
+            time.sleep(max(0, SWEEP_INTERVAL - (time.monotonic() - sweep_start)))
+except KeyboardInterrupt:
+    logger.info(f"stopped after {sweep} sweeps")
+logger.info("END")
+profiler.report("pyudev_profile_trace.json") # per-phase breakdown, only when STORAGE_PROFILE=1
\ No newline at end of file
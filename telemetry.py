@@ -0,0 +1,122 @@
+import time
+import numpy as np #fixed size arrays so the history of each device never grows past its capacity
+
+# Alert thresholds, tune these for the nodes being monitored
+TEMP_MAX_C = 60           # alert when the device gets hotter than this
+TEMP_SLOPE_MAX = 10       # alert when the temperature rises faster than this (Celsius per hour)
+MIN_FREE_GB = 5           # alert when free space drops below this
+MIN_HOURS_TO_FULL = 24    # alert when the device is forecast to fill up sooner than this
+MIN_TREND_SAMPLES = 5     # slopes and forecasts need at least this many known samples...
+MIN_TREND_HOURS = 0.25    # ...spread over at least this long, so rounding of single readings does not look like a trend
+
+
+def _to_float(value):
+    # the sweep reports "Unknown" when smartctl or the mount point is unavailable, store those as NaN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _slope(t, y):
+    # least squares slope of y over t (hours), ignoring missing samples and windows too small to trust
+    mask = ~np.isnan(y)
+    if np.count_nonzero(mask) < MIN_TREND_SAMPLES:
+        return np.nan
+    t = t[mask]
+    y = y[mask]
+    if t.max() - t.min() < MIN_TREND_HOURS:
+        return np.nan
+    dt = t - t.mean()
+    denom = np.dot(dt, dt)
+    if denom == 0:
+        return np.nan
+    return np.dot(dt, y - y.mean()) / denom
+
+
+def _last_known(t, y):
+    # newest sample of y that is not missing, so one failed reading does not hide the previous one
+    mask = ~np.isnan(y)
+    if not mask.any():
+        return np.nan
+    return y[mask][t[mask].argmax()]
+
+
+class DeviceHistory:
+    """Ring buffer of the last `capacity` samples (time, free space, temperature) of one device."""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.times = np.zeros(capacity)
+        self.free = np.full(capacity, np.nan)
+        self.temp = np.full(capacity, np.nan)
+        self.head = 0 # slot the next sample is written to
+        self.count = 0 # number of valid slots
+
+    def append(self, free_gb, temp_c, timestamp=None):
+        # once the buffer is full the oldest sample is overwritten
+        self.times[self.head] = time.time() if timestamp is None else timestamp
+        self.free[self.head] = _to_float(free_gb)
+        self.temp[self.head] = _to_float(temp_c)
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def stats(self):
+        # slope, min and max do not depend on sample order, so the valid slots are used as they sit in the buffer
+        n = self.count
+        times, free, temp = self.times[:n], self.free[:n], self.temp[:n]
+        hours = (times - times.min()) / 3600 if n else times
+
+        latest_free = _last_known(times, free)
+        fill_rate = -_slope(hours, free) if not np.isnan(latest_free) else np.nan # GB consumed per hour, negative while space is being freed
+        if fill_rate > 0:
+            hours_to_full = latest_free / fill_rate
+        else:
+            hours_to_full = np.inf
+
+        known_temp = temp[~np.isnan(temp)]
+        return {
+            "Samples": n,
+            "Fill rate(GB/h)": round(fill_rate, 4),
+            "Time to full(h)": round(hours_to_full, 2),
+            "Temp min": known_temp.min() if known_temp.size else np.nan,
+            "Temp max": known_temp.max() if known_temp.size else np.nan,
+            "Temp slope(C/h)": round(_slope(hours, temp), 4),
+            "Latest free": latest_free,
+            "Latest temp": _last_known(times, temp),
+        }
+
+
+def check_alerts(stats):
+    """Return a list of alert messages for the thresholds `stats` crosses."""
+    alerts = []
+    if stats["Latest temp"] > TEMP_MAX_C:
+        alerts.append(f"temperature {stats['Latest temp']:.0f}C above {TEMP_MAX_C}C")
+    if stats["Temp slope(C/h)"] > TEMP_SLOPE_MAX:
+        alerts.append(f"temperature rising {stats['Temp slope(C/h)']:.1f}C/h")
+    if stats["Latest free"] < MIN_FREE_GB:
+        alerts.append(f"free space {stats['Latest free']:.2f}GB below {MIN_FREE_GB}GB")
+    if stats["Time to full(h)"] < MIN_HOURS_TO_FULL:
+        alerts.append(f"forecast full in {stats['Time to full(h)']:.1f}h")
+    return alerts
+
+
+class TelemetryStore:
+    """One DeviceHistory per device, so memory stays bounded however long the tool runs."""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.devices = {}
+
+    def record(self, device, free_gb, temp_c, timestamp=None):
+        # adds one sweep sample for `device` and returns its updated rolling statistics and alerts
+        history = self.devices.get(device)
+        if history is None:
+            history = self.devices[device] = DeviceHistory(self.capacity)
+        history.append(free_gb, temp_c, timestamp)
+        stats = history.stats()
+        return stats, check_alerts(stats)
+
+    def forget(self, device):
+        # drops the history of a device that is no longer present
+        self.devices.pop(device, None)
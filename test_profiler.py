@@ -0,0 +1,81 @@
+import json
+import time
+import pytest
+import profiler
+
+
+@pytest.fixture(autouse=True)
+def profiling():
+    # every test starts with profiling on and no recorded spans, and leaves it off again
+    profiler.enable()
+    profiler.reset()
+    yield
+    profiler.disable()
+    profiler.reset()
+
+
+def test_disabled_span_is_shared_noop():
+    profiler.disable()
+    assert profiler.span("a") is profiler._NULL_SPAN
+    assert profiler.span("b") is profiler._NULL_SPAN
+    with profiler.span("a"):
+        pass
+    assert profiler.summary().empty
+
+
+def test_summary_totals_per_phase():
+    for _ in range(3):
+        with profiler.span("CBW build"):
+            sum(range(10000))
+    with profiler.span("bulk IN data"):
+        time.sleep(0.02)
+
+    report = profiler.summary()
+    assert list(report.columns) == ["Phase", "Calls", "Wall (ms)", "CPU (ms)", "Wait (ms)", "Mean wall (ms)", "CPU share (%)"]
+    rows = report.set_index("Phase")
+    assert rows.loc["CBW build", "Calls"] == 3
+    assert rows.loc["bulk IN data", "Calls"] == 1
+    # the sleep is spent waiting, not on the CPU, and is the slowest phase
+    assert report["Phase"].iloc[0] == "bulk IN data"
+    assert rows.loc["bulk IN data", "Wall (ms)"] >= 20
+    assert rows.loc["bulk IN data", "Wait (ms)"] > rows.loc["bulk IN data", "CPU (ms)"]
+    assert rows.loc["bulk IN data", "CPU share (%)"] < 50
+
+
+def test_summary_clips_wait_when_cpu_exceeds_wall(monkeypatch):
+    # clock granularity can make CPU time come out slightly above wall time
+    monkeypatch.setitem(profiler._totals, "CSW", [2, 1_000_000, 1_500_000])
+    row = profiler.summary().iloc[0]
+    assert row["Wait (ms)"] == 0
+    assert row["Wall (ms)"] == 1
+    assert row["CPU (ms)"] == 1.5
+    assert row["Mean wall (ms)"] == 0.5
+    assert row["CPU share (%)"] == 150
+
+
+def test_chrome_trace_events(tmp_path):
+    with profiler.span("bulk OUT"):
+        pass
+    name, start, wall, cpu, tid = profiler._trace[0]
+
+    path = tmp_path / "trace.json"
+    profiler.dump_chrome_trace(path)
+    trace = json.loads(path.read_text())
+    assert len(trace["traceEvents"]) == 1
+    event = trace["traceEvents"][0]
+    assert event["name"] == "bulk OUT"
+    assert event["ph"] == "X"
+    assert event["tid"] == tid
+    # Chrome traces are in microseconds
+    assert event["ts"] == (start - profiler._origin) / 1000
+    assert event["dur"] == wall / 1000
+    assert event["args"]["cpu_us"] == cpu / 1000
+
+
+def test_trace_is_capped_but_totals_are_not():
+    assert profiler._trace.maxlen == profiler.TRACE_EVENTS_MAX
+    for _ in range(profiler.TRACE_EVENTS_MAX + 5):
+        with profiler.span("logging"):
+            pass
+    assert len(profiler._trace) == profiler.TRACE_EVENTS_MAX
+    assert profiler.summary().iloc[0]["Calls"] == profiler.TRACE_EVENTS_MAX + 5
@@ -0,0 +1,93 @@
+import math
+import numpy as np
+import telemetry
+from telemetry import DeviceHistory, TelemetryStore, check_alerts
+
+HOUR = 3600
+
+
+def test_ring_buffer_wraps_once_full():
+    history = DeviceHistory(capacity=4)
+    for i in range(6):
+        history.append(100 - i, 40 + i, timestamp=i * HOUR)
+    assert history.count == 4
+    assert history.head == 2
+    # the two oldest samples were overwritten in place
+    assert sorted(history.times) == [2 * HOUR, 3 * HOUR, 4 * HOUR, 5 * HOUR]
+    stats = history.stats()
+    assert stats["Samples"] == 4
+    assert stats["Latest free"] == 95
+    assert stats["Latest temp"] == 45
+    assert stats["Temp min"] == 42
+    assert stats["Temp max"] == 45
+
+
+def test_slope_and_time_to_full(monkeypatch):
+    monkeypatch.setattr(telemetry, "MIN_TREND_SAMPLES", 3)
+    history = DeviceHistory(capacity=8)
+    for i in range(5):
+        history.append(100 - 2 * i, 30 + 0.5 * i, timestamp=i * HOUR)
+    stats = history.stats()
+    assert math.isclose(stats["Fill rate(GB/h)"], 2)
+    assert math.isclose(stats["Time to full(h)"], 46)  # 92 GB left at 2 GB/h
+    assert math.isclose(stats["Temp slope(C/h)"], 0.5)
+
+
+def test_no_trend_until_window_is_large_enough():
+    store = TelemetryStore()
+    store.record("/dev/sda", 100.00, 40, timestamp=0)
+    stats, alerts = store.record("/dev/sda", 99.99, 41, timestamp=2)
+    assert math.isnan(stats["Fill rate(GB/h)"])
+    assert math.isnan(stats["Temp slope(C/h)"])
+    assert stats["Time to full(h)"] == np.inf
+    assert alerts == []
+
+    # enough samples, but all within a few seconds
+    for i in range(2, 10):
+        stats, alerts = store.record("/dev/sda", 100 - i * 0.01, 40 + i, timestamp=i * 2)
+    assert math.isnan(stats["Temp slope(C/h)"])
+    assert alerts == []
+
+
+def test_all_unknown_device():
+    store = TelemetryStore()
+    for i in range(10):
+        stats, alerts = store.record("/dev/sdb", "Unknown", "unknown", timestamp=i * HOUR)
+    assert stats["Samples"] == 10
+    assert math.isnan(stats["Fill rate(GB/h)"])
+    assert stats["Time to full(h)"] == np.inf
+    assert math.isnan(stats["Temp min"]) and math.isnan(stats["Temp max"])
+    assert math.isnan(stats["Latest free"]) and math.isnan(stats["Latest temp"])
+    assert alerts == []
+
+
+def test_unknown_reading_keeps_last_known_value():
+    store = TelemetryStore()
+    store.record("/dev/sda", 3, 70, timestamp=0)
+    stats, alerts = store.record("/dev/sda", "Unknown", "unknown", timestamp=60)
+    assert stats["Latest temp"] == 70
+    assert stats["Latest free"] == 3
+    assert len(alerts) == 2
+
+
+def test_threshold_crossings():
+    base = {"Latest temp": 40, "Temp slope(C/h)": 1, "Latest free": 100, "Time to full(h)": 100}
+    assert check_alerts(base) == []
+    assert check_alerts({**base, "Latest temp": telemetry.TEMP_MAX_C + 1}) == [f"temperature {telemetry.TEMP_MAX_C + 1}C above {telemetry.TEMP_MAX_C}C"]
+    assert check_alerts({**base, "Temp slope(C/h)": telemetry.TEMP_SLOPE_MAX + 1}) == [f"temperature rising {telemetry.TEMP_SLOPE_MAX + 1:.1f}C/h"]
+    assert check_alerts({**base, "Latest free": telemetry.MIN_FREE_GB - 1}) == [f"free space {telemetry.MIN_FREE_GB - 1:.2f}GB below {telemetry.MIN_FREE_GB}GB"]
+    assert check_alerts({**base, "Time to full(h)": telemetry.MIN_HOURS_TO_FULL - 1}) == [f"forecast full in {telemetry.MIN_HOURS_TO_FULL - 1:.1f}h"]
+    # values exactly at the threshold do not alert
+    assert check_alerts({**base, "Latest temp": telemetry.TEMP_MAX_C, "Latest free": telemetry.MIN_FREE_GB}) == []
+
+
+def test_forget_removed_device():
+    store = TelemetryStore()
+    store.record("/dev/sda", 100, 40, timestamp=0)
+    store.record("/dev/sdb", 100, 40, timestamp=0)
+    store.forget("/dev/sdb")
+    store.forget("/dev/sdc")  # never seen, ignored
+    assert list(store.devices) == ["/dev/sda"]
+    # a device that comes back starts a fresh history
+    stats, alerts = store.record("/dev/sdb", 50, 40, timestamp=HOUR)
+    assert stats["Samples"] == 1